@@ -1,5 +1,7 @@
 import streamlit as st
+import os
 import re
+import time
 import uuid
 from datetime import datetime
 from main import (
@@ -9,7 +11,20 @@ from main import (
     generateUserStories,
     checkInvestFramework,
     Prioritize,
-    findEpicConflict
+    findEpicConflict,
+    PROMPT_VERSIONS
+)
+from compare import call_with_metrics, run_across_models
+from artifacts import ArtifactStore
+from workspace import (
+    STAGE_INPUTS,
+    init_workspace,
+    create_project,
+    get_project,
+    update_problem_statement,
+    set_project_model,
+    run_stage,
+    resume_state
 )
 from sqlalchemy import create_engine, Column, Integer, String, Text, DateTime
 from sqlalchemy.orm import declarative_base, sessionmaker
@@ -43,14 +58,15 @@ class UserLog(Base):
 Base.metadata.create_all(engine)
 
 Session = sessionmaker(bind=engine)
+WorkspaceSession = init_workspace(engine)
 
-def log_event(user_id, action, details):
+def log_event(user_id, action, details, model_name=None):
     """Store user actions in Supabase logs table with student_id & model_name."""
     session = Session()
     log = UserLog(
         user_id=user_id,
         student_id=st.session_state.get("student_id", "unknown"),
-        model_name=st.session_state.get("model_name", "default"),
+        model_name=model_name or st.session_state.get("model_name", "default"),
         action=action,
         details=str(details)
     )
@@ -66,6 +82,179 @@ def log_event(user_id, action, details):
 #     return logs
 
 regex_pattern = r'<think>[\s\S]*?</think>\n\n'
+
+@st.cache_resource
+def get_artifact_store():
+    """One compressed store shared by all sessions; session state only keeps handles."""
+    return ArtifactStore(
+        max_bytes=64 * 1024 * 1024,
+        spill_dir=os.getenv("ARTIFACT_SPILL_DIR"),
+        max_disk_bytes=int(os.getenv("ARTIFACT_DISK_MB", "512")) * 1024 * 1024
+    )
+
+artifact_store = get_artifact_store()
+
+def store_artifact(key, text):
+    st.session_state[key] = artifact_store.put(text)
+
+def load_handle(handle, model_name):
+    """Read an artifact, reloading it from the saved stage outputs if it was evicted from disk."""
+    try:
+        return artifact_store.get(handle)
+    except KeyError:
+        pass
+    project_id = st.session_state.get("project_id")
+    if project_id:
+        state = resume_state(WorkspaceSession, project_id, model_name, PROMPT_VERSIONS)
+        for output in state.values():
+            if ArtifactStore.handle_for(output) == handle:
+                artifact_store.put(output)
+                return output
+    st.warning("⚠️ A saved result has expired. Please run the previous step again.")
+    st.stop()
+
+def load_artifact(key):
+    return load_handle(st.session_state[key], st.session_state["model_name"])
+
+def ensure_project():
+    """Create the persisted project for this session on first use."""
+    if not st.session_state.get("project_id"):
+        st.session_state["project_id"] = create_project(
+            WorkspaceSession, st.session_state.get("student_id", "unknown")
+        )
+        st.query_params["project"] = st.session_state["project_id"]
+        st.session_state["restored_for"] = (st.session_state["project_id"], st.session_state["model_name"])
+    return st.session_state["project_id"]
+
+def run_cached_stage(stage, fn, input_text):
+    """Reuse the saved output when the stage input is unchanged, otherwise call the LLM.
+
+    Returns (output, cached).
+    """
+    model_name = st.session_state["model_name"]
+
+    def generate(text):
+        output = fn(text, st.session_state["api_key"], model_name)
+        if model_name == "qwen/qwen3-32b":
+            output = re.sub(regex_pattern, '', output)
+        return output
+
+    project_id = ensure_project()
+    set_project_model(WorkspaceSession, project_id, model_name)
+    output, cached = run_stage(
+        WorkspaceSession, project_id, stage, generate, input_text,
+        model_name, PROMPT_VERSIONS[stage],
+        force=st.session_state.get("regenerate", False)
+    )
+    if cached:
+        st.caption("♻️ Loaded saved result (inputs unchanged).")
+    return output, cached
+
+def restore_project():
+    """Load the saved pipeline for the current project and model into session state."""
+    project_id = st.session_state.get("project_id")
+    key = (project_id, st.session_state["model_name"])
+    if not project_id or st.session_state.get("restored_for") == key:
+        return
+    for stage in STAGE_INPUTS:
+        st.session_state.pop(stage, None)
+    state = resume_state(WorkspaceSession, project_id, st.session_state["model_name"], PROMPT_VERSIONS)
+    problem_statement = state.pop("problem_statement", "")
+    # Only fill the problem statement on the first load; a model switch keeps what is typed
+    if st.session_state.get("restored_for") is None:
+        st.session_state["problem_statement"] = problem_statement
+    for stage, output in state.items():
+        store_artifact(stage, output)
+    st.session_state["restored_for"] = key
+
+# (stage, button, spinner text, subheader, stage function, log action)
+COMPARE_STEPS = [
+    ("stakeholders", "🔍 Analyze Stakeholders", "Identifying stakeholders...", "👥 Stakeholders & End Users", findStakeholder, "analyze_stakeholders"),
+    ("elicitation", "📋 Generate Elicitation Techniques", "Generating elicitation techniques...", "🛠️ Elicitation Techniques", generateElicitationTechniques, "generate_elicitation"),
+    ("justification", "✅ Justify Elicitation Techniques", "Justifying elicitation techniques...", "📖 Justification for Techniques", justificationElicitationTechnique, "justify_elicitation"),
+    ("user_stories", "📝 Generate User Stories", "Generating user stories...", "📘 User Stories", generateUserStories, "generate_user_stories"),
+    ("invest", "🔎 Validate with INVEST", "Validating with INVEST framework...", "✅ INVEST Validation Results", checkInvestFramework, "invest_validation"),
+    ("prioritize", "📊 Prioritize with MoSCoW", "Prioritizing user stories...", "📌 MoSCoW Prioritization", Prioritize, "prioritize"),
+    ("conflicts", "⚡ Identify Epic Conflicts", "Analyzing conflicts across EPICs...", "⚔️ EPIC Conflicts & Resolutions", findEpicConflict, "epic_conflicts"),
+]
+
+def run_comparison_stage(stage, fn, inputs, models, subheader, action):
+    """Run one stage for every model concurrently and fill in its column as results arrive."""
+    api_key = st.session_state["api_key"]
+    project_id = ensure_project()
+    force = st.session_state.get("regenerate", False)
+
+    # Runs in a worker thread, so it must not touch st.* APIs
+    def task(model_name):
+        # Left as None on a cache hit so saved results don't look like 0-second, 0-token runs
+        metrics = {"latency_s": None, "input_tokens": None, "output_tokens": None}
+
+        def generate(text):
+            output, call_metrics = call_with_metrics(fn, text, api_key, model_name)
+            metrics.update(call_metrics)
+            if model_name == "qwen/qwen3-32b":
+                output = re.sub(regex_pattern, '', output)
+            return output
+
+        output, cached = run_stage(
+            WorkspaceSession, project_id, stage, generate, inputs[model_name],
+            model_name, PROMPT_VERSIONS[stage], force=force
+        )
+        return output, dict(metrics, cached=cached, output_chars=len(output))
+
+    st.subheader(subheader)
+    columns = st.columns(len(models))
+    placeholders = {}
+    for column, model_name in zip(columns, models):
+        column.markdown(f"**{model_name}**")
+        placeholders[model_name] = column.empty()
+        placeholders[model_name].info("⏳ Waiting for response...")
+
+    started = time.perf_counter()
+    for model_name, result, error in run_across_models(task, models):
+        placeholder = placeholders[model_name].container()
+        if error is not None:
+            placeholder.error(f"❌ {error}")
+            log_event(
+                st.session_state["user_id"], "comparison_error",
+                {"stage": action, "error": str(error), "comparison": True}, model_name=model_name
+            )
+            continue
+        output, metrics = result
+        if metrics["cached"]:
+            placeholder.caption(f"♻️ saved result · {metrics['output_chars']} chars")
+        else:
+            placeholder.caption(
+                f"⏱️ {metrics['latency_s']}s · {metrics['input_tokens']} in / "
+                f"{metrics['output_tokens']} out tokens · {metrics['output_chars']} chars"
+            )
+        placeholder.write(output)
+        st.session_state["compare"].setdefault(model_name, {})[stage] = artifact_store.put(output)
+        log_event(
+            st.session_state["user_id"], action,
+            dict(metrics, result=output, comparison=True), model_name=model_name
+        )
+    st.caption(f"Wall-clock for all models: {time.perf_counter() - started:.1f}s")
+
+def render_comparison(problem_statement, models):
+    """Comparison mode: the same workflow, with every stage fanned out across the selected models."""
+    if "compare" not in st.session_state:
+        st.session_state["compare"] = {}
+    results = st.session_state["compare"]
+    for stage, button, spinner, subheader, fn, action in COMPARE_STEPS:
+        source = STAGE_INPUTS[stage]
+        if source != "problem_statement" and not all(source in results.get(model_name, {}) for model_name in models):
+            continue
+        if st.button(button, key=f"compare_{stage}"):
+            # Inputs are only loaded from the artifact store once the stage actually runs
+            if source == "problem_statement":
+                update_problem_statement(WorkspaceSession, ensure_project(), problem_statement)
+                inputs = {model_name: problem_statement for model_name in models}
+            else:
+                inputs = {model_name: load_handle(results[model_name][source], model_name) for model_name in models}
+            with st.spinner(spinner):
+                run_comparison_stage(stage, fn, inputs, models, subheader, action)
+
 # ---------------------------
 # Streamlit Page Setup
 # ---------------------------
@@ -102,6 +291,15 @@ st.session_state["student_id"] = st.sidebar.text_input(
 # Model dropdown (locked after first selection until epic is completed)
 model_options = ["qwen/qwen3-32b", "openai/gpt-oss-120b", "llama-3.3-70b-versatile"]
 
+# Resume a saved project (the id is kept in the URL so a refresh picks it up),
+# with the model it was last run on so the locked dropdown matches its outputs
+if "project_id" not in st.session_state:
+    project_id = st.query_params.get("project")
+    project = get_project(WorkspaceSession, project_id) if project_id else None
+    st.session_state["project_id"] = project.id if project is not None else None
+    if project is not None and project.model_name in model_options:
+        st.session_state["model_name"] = project.model_name
+
 selected_model = st.sidebar.selectbox(
     "Select Model:",
     model_options,
@@ -114,6 +312,13 @@ selected_model = st.sidebar.selectbox(
 if st.session_state["model_name"] and not st.session_state.lock_model:
     st.session_state.lock_model = True
 
+# Comparison mode runs every stage on several models side by side
+compare_mode = st.sidebar.checkbox("🆚 Compare models", key="compare_mode")
+if compare_mode:
+    compare_models = st.sidebar.multiselect(
+        "Models to compare:", model_options, default=model_options, key="compare_models"
+    )
+
 st.sidebar.info(
     "Don’t have a GROQ API key yet? You can create one by visiting "
     "[Groq Console – API Keys](https://console.groq.com/keys). "
@@ -127,6 +332,13 @@ api_key = st.sidebar.text_input("Enter your GROQ API Key", type="password")
 if "user_id" not in st.session_state:
     st.session_state["user_id"] = str(uuid.uuid4())
 
+restore_project()
+
+st.sidebar.subheader("💾 Project")
+if st.session_state["project_id"]:
+    st.sidebar.caption(f"Project ID: `{st.session_state['project_id']}` (bookmark this page to resume)")
+st.sidebar.checkbox("Regenerate (ignore saved results)", key="regenerate")
+
 # ---------------------------
 # Workflow
 # ---------------------------
@@ -139,102 +351,97 @@ if api_key:
         problem_statement = st.text_area(
             "✍️ Enter Problem Statement", 
             height=150, 
-            placeholder="e.g., Create a system to build LLM"
+            placeholder="e.g., Create a system to build LLM",
+            key="problem_statement"
         )
 
+        if compare_mode:
+            if compare_models:
+                render_comparison(problem_statement, compare_models)
+            else:
+                st.info("Select at least one model to compare in the sidebar.")
+            st.stop()
+
         if st.button("🔍 Analyze Stakeholders"):
             with st.spinner("Identifying stakeholders..."):
-                stakeholders = findStakeholder(problem_statement, st.session_state["api_key"], st.session_state["model_name"])
+                update_problem_statement(WorkspaceSession, ensure_project(), problem_statement)
+                stakeholders, cached = run_cached_stage("stakeholders", findStakeholder, problem_statement)
             st.subheader("👥 Stakeholders & End Users")
-            if st.session_state["model_name"]=="qwen/qwen3-32b":
-                stakeholders = re.sub(regex_pattern, '', stakeholders)
             st.write(stakeholders)
-            st.session_state["stakeholders"] = stakeholders
-            log_event(st.session_state["user_id"], "analyze_stakeholders", {"problem": problem_statement, "result": stakeholders})
+            store_artifact("stakeholders", stakeholders)
+            log_event(st.session_state["user_id"], "analyze_stakeholders", {"problem": problem_statement, "result": stakeholders, "cached": cached})
 
         # Step 2: Elicitation Techniques
         if "stakeholders" in st.session_state:
             if st.button("📋 Generate Elicitation Techniques"):
                 with st.spinner("Generating elicitation techniques..."):
-                    elicitation = generateElicitationTechniques(
-                        st.session_state["stakeholders"], st.session_state["api_key"], st.session_state["model_name"]
+                    elicitation, cached = run_cached_stage(
+                        "elicitation", generateElicitationTechniques, load_artifact("stakeholders")
                     )
                 st.subheader("🛠️ Elicitation Techniques")
-                if st.session_state["model_name"]=="qwen/qwen3-32b":
-                    elicitation=re.sub(regex_pattern, '', elicitation)
                 st.write(elicitation)
-                st.session_state["elicitation"] = elicitation
-                log_event(st.session_state["user_id"], "generate_elicitation", {"result": elicitation})
+                store_artifact("elicitation", elicitation)
+                log_event(st.session_state["user_id"], "generate_elicitation", {"result": elicitation, "cached": cached})
 
         # Step 3: Justification
         if "elicitation" in st.session_state:
             if st.button("✅ Justify Elicitation Techniques"):
                 with st.spinner("Justifying elicitation techniques..."):
-                    justification = justificationElicitationTechnique(
-                        st.session_state["elicitation"], st.session_state["api_key"], st.session_state["model_name"]
+                    justification, cached = run_cached_stage(
+                        "justification", justificationElicitationTechnique, load_artifact("elicitation")
                     )
                 st.subheader("📖 Justification for Techniques")
-                if st.session_state["model_name"]=="qwen/qwen3-32b":
-                    justification=re.sub(regex_pattern, '', justification)
                 st.write(justification)
-                st.session_state["justification"] = justification
-                log_event(st.session_state["user_id"], "justify_elicitation", {"result": justification})
+                store_artifact("justification", justification)
+                log_event(st.session_state["user_id"], "justify_elicitation", {"result": justification, "cached": cached})
 
         # Step 4: Generate User Stories
         if "stakeholders" in st.session_state:
             if st.button("📝 Generate User Stories"):
                 with st.spinner("Generating user stories..."):
-                    user_stories = generateUserStories(
-                        st.session_state["stakeholders"], st.session_state["api_key"], st.session_state["model_name"]
+                    user_stories, cached = run_cached_stage(
+                        "user_stories", generateUserStories, load_artifact("stakeholders")
                     )
                 st.subheader("📘 User Stories")
-                if st.session_state["model_name"]=="qwen/qwen3-32b":
-                    user_stories=re.sub(regex_pattern, '', user_stories)
                 st.write(user_stories)
-                st.session_state["user_stories"] = user_stories
-                log_event(st.session_state["user_id"], "generate_user_stories", {"result": user_stories})
+                store_artifact("user_stories", user_stories)
+                log_event(st.session_state["user_id"], "generate_user_stories", {"result": user_stories, "cached": cached})
 
         # Step 5: Validate with INVEST
         if "user_stories" in st.session_state:
             if st.button("🔎 Validate with INVEST"):
                 with st.spinner("Validating with INVEST framework..."):
-                    invest = checkInvestFramework(
-                        st.session_state["user_stories"], st.session_state["api_key"],st.session_state["model_name"]
+                    invest, cached = run_cached_stage(
+                        "invest", checkInvestFramework, load_artifact("user_stories")
                     )
                 st.subheader("✅ INVEST Validation Results")
-                if st.session_state["model_name"]=="qwen/qwen3-32b":
-                    invest = re.sub(regex_pattern, '', invest)
                 st.write(invest)
-                st.session_state["invest"] = invest
-                log_event(st.session_state["user_id"], "invest_validation", {"result": invest})
+                store_artifact("invest", invest)
+                log_event(st.session_state["user_id"], "invest_validation", {"result": invest, "cached": cached})
 
         # Step 6: Prioritize with MoSCoW
         if "invest" in st.session_state:
             if st.button("📊 Prioritize with MoSCoW"):
                 with st.spinner("Prioritizing user stories..."):
-                    prioritize = Prioritize(
-                        st.session_state["invest"], st.session_state["api_key"],st.session_state["model_name"]
+                    prioritize, cached = run_cached_stage(
+                        "prioritize", Prioritize, load_artifact("invest")
                     )
                 st.subheader("📌 MoSCoW Prioritization")
-                if st.session_state["model_name"]=="qwen/qwen3-32b":
-                    prioritize = re.sub(regex_pattern, '', prioritize)
                 st.write(prioritize)
-                st.session_state["prioritize"] = prioritize
-                log_event(st.session_state["user_id"], "prioritize", {"result": prioritize})
+                store_artifact("prioritize", prioritize)
+                log_event(st.session_state["user_id"], "prioritize", {"result": prioritize, "cached": cached})
 
         # Step 7: Find EPIC Conflicts
         if "invest" in st.session_state:
             if st.button("⚡ Identify Epic Conflicts"):
                 with st.spinner("Analyzing conflicts across EPICs..."):
-                    conflicts = findEpicConflict(
-                        st.session_state["invest"], st.session_state["api_key"], st.session_state["model_name"]
+                    conflicts, cached = run_cached_stage(
+                        "conflicts", findEpicConflict, load_artifact("invest")
                     )
                 st.subheader("⚔️ EPIC Conflicts & Resolutions")
-                if st.session_state["model_name"] == "qwen/qwen3-32b":
-                    conflicts = re.sub(regex_pattern, '', conflicts)
                 st.write(conflicts)
-                st.session_state["conflicts"] = conflicts
-                log_event(st.session_state["user_id"], "epic_conflicts", {"result": conflicts})
+                store_artifact("conflicts", conflicts)
+                log_event(st.session_state["user_id"], "epic_conflicts", {"result": conflicts, "cached": cached})
 
                 # ✅ Unlock model after epic is shown
                 st.session_state.lock_model = False
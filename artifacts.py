@@ -0,0 +1,165 @@
+"""Shared, size-capped store for large stage outputs.
+
+Sessions keep only a short handle in `st.session_state`; the text itself lives
+here, zlib-compressed, in an in-memory LRU that spills to disk once it grows
+past `max_bytes`. The spill directory is an LRU too: once it holds more than
+`max_disk_bytes` the least recently used files are deleted, and `get()` raises
+KeyError for them so callers can reload the text from its source. Only files
+named like handles are ever adopted or deleted there. Handles are
+content hashes, so identical outputs across sessions are stored once.
+"""
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import threading
+import weakref
+import zlib
+from collections import OrderedDict
+
+# Only files named like this are ever adopted or deleted from the spill directory.
+HANDLE_NAME = re.compile(r"^[0-9a-f]{64}$")
+TMP_NAME = re.compile(r"^[0-9a-f]{64}\.\d+\.tmp$")
+
+
+class ArtifactStore:
+    def __init__(self, max_bytes=32 * 1024 * 1024, spill_dir=None, max_disk_bytes=256 * 1024 * 1024, level=6):
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.level = level
+        if spill_dir:
+            # A configured directory should be dedicated to one store; it is reused across restarts
+            self.spill_dir = spill_dir
+            os.makedirs(self.spill_dir, exist_ok=True)
+        else:
+            # Private to this process and removed with the store
+            self.spill_dir = tempfile.mkdtemp(prefix="re-artifacts-")
+            weakref.finalize(self, shutil.rmtree, self.spill_dir, ignore_errors=True)
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._scan_spill_dir()
+
+    @staticmethod
+    def handle_for(text):
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def put(self, text):
+        """Store text and return its handle."""
+        data = text.encode("utf-8")
+        handle = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if handle in self._memory:
+                self._memory.move_to_end(handle)
+                return handle
+        blob = zlib.compress(data, self.level)
+        with self._lock:
+            self._remember(handle, blob)
+        return handle
+
+    def get(self, handle):
+        """Return the text for a handle, reading it back from disk if it was spilled."""
+        with self._lock:
+            blob = self._memory.get(handle)
+            if blob is not None:
+                self._memory.move_to_end(handle)
+        if blob is None:
+            try:
+                with open(self._path(handle), "rb") as f:
+                    blob = f.read()
+            except FileNotFoundError:
+                with self._lock:
+                    self._forget_file(handle)
+                raise KeyError(handle) from None
+            with self._lock:
+                if handle in self._disk:
+                    self._disk.move_to_end(handle)
+                self._remember(handle, blob)
+        return zlib.decompress(blob).decode("utf-8")
+
+    def __contains__(self, handle):
+        with self._lock:
+            return handle in self._memory or handle in self._disk
+
+    def stats(self):
+        with self._lock:
+            return {
+                "items_in_memory": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "items_on_disk": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+            }
+
+    def _scan_spill_dir(self):
+        entries = []
+        for entry in os.scandir(self.spill_dir):
+            if not entry.is_file():
+                continue
+            if TMP_NAME.match(entry.name):
+                # Left over from an interrupted write
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    pass
+                continue
+            if not HANDLE_NAME.match(entry.name):
+                continue
+            stat = entry.stat()
+            entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, handle, size in sorted(entries):
+            self._disk[handle] = size
+            self._disk_bytes += size
+        with self._lock:
+            self._trim_disk()
+
+    def _path(self, handle):
+        return os.path.join(self.spill_dir, handle)
+
+    def _remember(self, handle, blob):
+        # Caller holds the lock.
+        if handle in self._memory:
+            self._memory.move_to_end(handle)
+            return
+        self._memory[handle] = blob
+        self._memory_bytes += len(blob)
+        while self._memory_bytes > self.max_bytes and len(self._memory) > 1:
+            old_handle, old_blob = self._memory.popitem(last=False)
+            self._memory_bytes -= len(old_blob)
+            self._spill(old_handle, old_blob)
+
+    def _spill(self, handle, blob):
+        # Caller holds the lock.
+        if handle in self._disk:
+            self._disk.move_to_end(handle)
+            return
+        path = self._path(handle)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Dropping the blob is safe: get() raises KeyError and callers reload it from the DB
+            return
+        self._disk[handle] = len(blob)
+        self._disk_bytes += len(blob)
+        self._trim_disk()
+
+    def _trim_disk(self):
+        # Caller holds the lock.
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            handle = next(iter(self._disk))
+            try:
+                os.remove(self._path(handle))
+            except FileNotFoundError:
+                pass
+            self._forget_file(handle)
+
+    def _forget_file(self, handle):
+        # Caller holds the lock.
+        size = self._disk.pop(handle, None)
+        if size is not None:
+            self._disk_bytes -= size
@@ -0,0 +1,46 @@
+"""Wall-clock of comparison mode versus running the same models one after another.
+
+Uses fake stage functions that sleep for a per-model latency, so no API key is needed:
+
+    python benchmarks/compare_models.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from compare import call_with_metrics, run_across_models  # noqa: E402
+
+LATENCIES = {"qwen/qwen3-32b": 1.2, "openai/gpt-oss-120b": 0.8, "llama-3.3-70b-versatile": 0.5}
+
+
+def fake_stage(input_text, api_key, model_name):
+    time.sleep(LATENCIES[model_name])
+    return f"{model_name}: {input_text}"
+
+
+def main():
+    models = list(LATENCIES)
+
+    started = time.perf_counter()
+    for model_name in models:
+        call_with_metrics(fake_stage, "problem", "key", model_name)
+    serial = time.perf_counter() - started
+
+    started = time.perf_counter()
+    order = []
+    for model_name, (output, metrics), error in run_across_models(
+        lambda model_name: call_with_metrics(fake_stage, "problem", "key", model_name), models
+    ):
+        order.append(f"{model_name} ({metrics['latency_s']}s)")
+    concurrent = time.perf_counter() - started
+
+    print(f"slowest model:  {max(LATENCIES.values()):.2f}s")
+    print(f"sum of models:  {sum(LATENCIES.values()):.2f}s")
+    print(f"serial:         {serial:.2f}s")
+    print(f"concurrent:     {concurrent:.2f}s")
+    print("arrival order: ", ", ".join(order))
+
+
+if __name__ == "__main__":
+    main()
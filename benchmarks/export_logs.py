@@ -0,0 +1,96 @@
+"""Peak RSS and throughput of the streaming export on a large synthetic logs table.
+
+Each mode runs in its own process so ru_maxrss is not shared between them:
+
+    python benchmarks/export_logs.py --rows 100000
+"""
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from export import STAGE_ACTIONS, export  # noqa: E402
+
+MODELS = ["qwen/qwen3-32b", "openai/gpt-oss-120b", "llama-3.3-70b-versatile"]
+# Plain, emphasised and table-row story formats, as the models produce all three.
+STORIES = [
+    "**User Story {i}:** As a commuter, I want to buy a ticket from my phone, so that I skip the queue.\n",
+    "- **As a** commuter, **I want to** buy a ticket from my phone, **so that** I skip the queue.\n",
+    "| US-{i} | As a commuter, I want to buy a ticket from my phone, so that I skip the queue | Must |\n",
+]
+
+
+def build_table(url, rows):
+    engine = create_engine(url)
+    start = datetime(2025, 9, 1)
+    actions = list(STAGE_ACTIONS)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE logs (id INTEGER PRIMARY KEY, user_id TEXT, student_id TEXT, model_name TEXT,"
+            " action TEXT, details TEXT, timestamp DATETIME)"
+        ))
+        batch = []
+        for i in range(rows):
+            action = actions[i % len(actions)]
+            result = "".join(STORIES[n % len(STORIES)].format(i=n) for n in range(15)) if action == "generate_user_stories" else "x" * 2000
+            batch.append({
+                "u": f"run-{i // len(actions)}",
+                "s": f"2024{random.randint(0, 200):05d}",
+                "m": random.choice(MODELS),
+                "a": action,
+                "d": str({"result": result}),
+                "t": start + timedelta(seconds=i),
+            })
+            if len(batch) == 5000:
+                conn.execute(text("INSERT INTO logs (user_id, student_id, model_name, action, details, timestamp)"
+                                  " VALUES (:u, :s, :m, :a, :d, :t)"), batch)
+                batch = []
+        if batch:
+            conn.execute(text("INSERT INTO logs (user_id, student_id, model_name, action, details, timestamp)"
+                              " VALUES (:u, :s, :m, :a, :d, :t)"), batch)
+
+
+def run_mode(url, mode):
+    engine = create_engine(url)
+    started = time.perf_counter()
+    with open(os.devnull, "w") as out:
+        if mode == "fetchall":
+            # What db.fetch_logs() does today.
+            with engine.connect() as conn:
+                rows = conn.execute(text("SELECT * FROM logs")).fetchall()
+            count = len(rows)
+        else:
+            count = export(engine, mode, out)
+    elapsed = time.perf_counter() - started
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"{mode:9} {count:>9} records {elapsed:7.2f}s {count / elapsed:>10.0f} rec/s  peak RSS {peak_mb:7.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--mode")
+    parser.add_argument("--url")
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.url, args.mode)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'logs.db')}"
+        build_table(url, args.rows)
+        for mode in ["fetchall", "jsonl", "csv", "md"]:
+            subprocess.run([sys.executable, __file__, "--mode", mode, "--url", url], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Memory held by 200 simulated sessions: raw texts in session state vs. artifact handles.
+
+Each session holds the seven stage outputs (plus a reasoning block on some
+models); a share of the sessions work on the same problem and get identical
+outputs, as happens when a class runs the same case study.
+
+    python benchmarks/session_memory.py --sessions 200 --cap-mb 2 --disk-cap-mb 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from artifacts import ArtifactStore  # noqa: E402
+
+STAGES = ["stakeholders", "elicitation", "justification", "user_stories", "invest", "prioritize", "conflicts"]
+WORDS = (
+    "user story stakeholder system ticket commuter admin report payment validate priority must should "
+    "could won't epic conflict resolution requirement interview survey workshop acceptance criteria "
+    "scenario failure success secure reliable fast mobile web database network error message"
+).split()
+
+
+def fake_output(rng, size):
+    return " ".join(rng.choices(WORDS, k=size // 7))
+
+
+def make_session(index):
+    # Every fourth session reuses the outputs of another one.
+    rng = random.Random(index - index % 4 if index % 4 == 3 else index)
+    session = {}
+    for stage in STAGES:
+        text = fake_output(rng, rng.randint(8_000, 40_000))
+        if rng.random() < 0.3:
+            text = "<think>" + fake_output(rng, 10_000) + "</think>\n\n" + text
+        session[stage] = text
+    return session
+
+
+def measure(build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--cap-mb", type=float, default=2)
+    parser.add_argument("--disk-cap-mb", type=float, default=4)
+    args = parser.parse_args()
+    mb = 1024 * 1024
+
+    def raw():
+        return [make_session(i) for i in range(args.sessions)]
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        store = ArtifactStore(
+            max_bytes=int(args.cap_mb * mb), spill_dir=spill_dir, max_disk_bytes=int(args.disk_cap_mb * mb)
+        )
+
+        def handles():
+            return [{k: store.put(v) for k, v in make_session(i).items()} for i in range(args.sessions)]
+
+        sessions, raw_current, raw_peak, raw_time = measure(raw)
+        del sessions
+        sessions, store_current, store_peak, store_time = measure(handles)
+
+        started = time.perf_counter()
+        evicted = 0
+        for session in sessions:
+            for handle in session.values():
+                try:
+                    store.get(handle)
+                except KeyError:
+                    # The app reloads these from stage_outputs
+                    evicted += 1
+        read_time = time.perf_counter() - started
+        spilled = sum(os.path.getsize(os.path.join(spill_dir, f)) for f in os.listdir(spill_dir))
+
+    print(f"sessions:                {args.sessions} x {len(STAGES)} stage outputs")
+    print(f"raw session state:       {raw_current / mb:8.1f} MB resident, {raw_peak / mb:.1f} MB peak ({raw_time:.1f}s)")
+    print(f"handles + store:         {store_current / mb:8.1f} MB resident, {store_peak / mb:.1f} MB peak ({store_time:.1f}s), cap {args.cap_mb} MB")
+    print(f"store stats:             {store.stats()}")
+    print(f"spill dir on disk:       {spilled / mb:8.1f} MB, cap {args.disk_cap_mb} MB")
+    print(f"evicted from disk:       {evicted} lookups (reloaded from the DB in the app)")
+    print(f"read back every output:  {read_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Count LLM calls avoided by the persisted workspace across simulated app restarts.
+
+Runs the full seven-stage pipeline against a throwaway SQLite database with a
+fake LLM, "restarting" (new session factory, empty session state) between runs.
+
+    python benchmarks/workspace_restarts.py --restarts 5
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from sqlalchemy import create_engine
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from workspace import (  # noqa: E402
+    STAGE_INPUTS, hash_input, init_workspace, create_project, update_problem_statement, run_stage, resume_state
+)
+
+PROMPT_VERSIONS = {stage: 1 for stage in STAGE_INPUTS}
+MODEL = "llama-3.3-70b-versatile"
+
+
+def run_pipeline(Session, project_id, problem_statement, calls):
+    def fake_llm(stage):
+        def generate(text):
+            calls[0] += 1
+            return f"{stage} output for input {hash_input(text)[:12]}\n" * 50
+        return generate
+
+    update_problem_statement(Session, project_id, problem_statement)
+    state = {"problem_statement": problem_statement}
+    for stage, source in STAGE_INPUTS.items():
+        state[stage], _ = run_stage(
+            Session, project_id, stage, fake_llm(stage), state[source], MODEL, PROMPT_VERSIONS[stage]
+        )
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--restarts", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{os.path.join(tmp, 'workspace.db')}"
+        Session = init_workspace(create_engine(url))
+        project_id = create_project(Session, "bench")
+        problem = "Develop a subway ticket distribution system."
+
+        calls = [0]
+        run_pipeline(Session, project_id, problem, calls)
+        baseline = calls[0]
+
+        for _ in range(args.restarts):
+            Session = init_workspace(create_engine(url))
+            restored = resume_state(Session, project_id, MODEL, PROMPT_VERSIONS)
+            assert set(restored) == set(STAGE_INPUTS) | {"problem_statement"}
+            run_pipeline(Session, project_id, problem, calls)
+
+        # Editing the problem statement invalidates every stage downstream of it.
+        run_pipeline(Session, project_id, problem + " Include monthly passes.", calls)
+
+        # Going back to the original problem is all cache hits and still resumes fully.
+        run_pipeline(Session, project_id, problem, calls)
+        restored = resume_state(init_workspace(create_engine(url)), project_id, MODEL, PROMPT_VERSIONS)
+        assert set(restored) == set(STAGE_INPUTS) | {"problem_statement"}
+
+    without_cache = baseline * (args.restarts + 3)
+    print(f"stages per run:          {baseline}")
+    print(f"runs:                    {args.restarts + 3} ({args.restarts} restarts, 1 edited problem, 1 reverted)")
+    print(f"LLM calls without cache: {without_cache}")
+    print(f"LLM calls with cache:    {calls[0]}")
+    print(f"LLM calls avoided:       {without_cache - calls[0]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Run one pipeline stage across several models at once for side-by-side comparison."""
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from langchain_core.callbacks import get_usage_metadata_callback
+
+
+def call_with_metrics(fn, input_text, api_key, model_name):
+    """Call a main.py stage function and return its output with latency and token usage."""
+    started = time.perf_counter()
+    with get_usage_metadata_callback() as usage:
+        output = fn(input_text, api_key, model_name)
+    latency = time.perf_counter() - started
+    input_tokens = sum(u.get("input_tokens", 0) for u in usage.usage_metadata.values())
+    output_tokens = sum(u.get("output_tokens", 0) for u in usage.usage_metadata.values())
+    return output, {
+        "latency_s": round(latency, 3),
+        "input_tokens": input_tokens,
+        "output_tokens": output_tokens,
+    }
+
+
+def run_across_models(task, models, max_workers=None):
+    """Run task(model) for every model concurrently.
+
+    Yields (model, result, error) in completion order, so callers can show each
+    model's output as soon as it arrives. A failing model does not stop the others.
+    """
+    if not models:
+        return
+    with ThreadPoolExecutor(max_workers=max_workers or len(models)) as pool:
+        futures = {pool.submit(task, model): model for model in models}
+        for future in as_completed(futures):
+            model = futures[future]
+            try:
+                yield model, future.result(), None
+            except Exception as error:
+                yield model, None, error
@@ -1,5 +1,6 @@
 import streamlit as st
 from sqlalchemy import create_engine, text
+from export import iter_logs
 
 # Read from Streamlit secrets
 DB_USER = st.secrets["user"]
@@ -26,3 +27,7 @@ def fetch_logs():
         result = conn.execute(text("SELECT * FROM logs")).fetchall()
         return result
 
+
+def stream_logs(**filters):
+    """Iterate stage-output logs with a server-side cursor instead of loading the whole table."""
+    return iter_logs(engine, **filters)
@@ -0,0 +1,213 @@
+"""Stream logged runs out of the `logs` table as Markdown, CSV or JSONL.
+
+Rows are read through a server-side cursor and every writer is a generator, so
+memory stays flat no matter how many runs are exported.
+
+    python export.py --format csv --out runs.csv --student-id 202411080
+"""
+import argparse
+import ast
+import csv
+import io
+import json
+import os
+import re
+import sys
+from datetime import datetime
+from sqlalchemy import create_engine, text
+
+# Log actions that carry a stage output, mapped to a readable stage name.
+STAGE_ACTIONS = {
+    "analyze_stakeholders": "Stakeholders & End Users",
+    "generate_elicitation": "Elicitation Techniques",
+    "justify_elicitation": "Justification for Techniques",
+    "generate_user_stories": "User Stories",
+    "invest_validation": "INVEST Validation",
+    "prioritize": "MoSCoW Prioritization",
+    "epic_conflicts": "EPIC Conflicts & Resolutions",
+}
+
+# Stages whose output is a list of user stories.
+STORY_ACTIONS = {"generate_user_stories", "invest_validation", "prioritize"}
+
+# Tolerates markdown emphasis around the keywords ("**As a** commuter, **I want to** ...")
+# and stops at "|" so table columns such as "| Must |" stay out of the benefit. A "."
+# only ends the story at the end of a line, before emphasis or "|", or before a new
+# capitalised sentence, so "e.g. bots" and "v1.5" survive.
+STORY_PATTERN = re.compile(
+    r"As an?[*_]*\s+(?P<role>[^,|\n]+?)[*_]*,?\s+[*_]*I want(?: to)?[*_]*\s+(?P<goal>[^|\n]+?)[*_]*,?\s+"
+    r"[*_]*so that[*_]*\s+(?P<benefit>[^|\n]+?)(?:\.(?=[*_|]|[ \t]*$|\s+(?-i:[A-Z])|\s+[*_|])|\||$)",
+    re.IGNORECASE | re.MULTILINE,
+)
+EMPHASIS = re.compile(r"(?<!\w)[*_]+|[*_]+(?!\w)")
+LEADING_TO = re.compile(r"^to\s+", re.IGNORECASE)
+
+FIELDS = [
+    "log_id", "user_id", "student_id", "model_name", "timestamp", "action",
+    "stage", "comparison", "cached", "latency_s", "input_tokens", "output_tokens", "output_chars",
+    "story_index", "role", "goal", "benefit", "text",
+]
+
+
+def iter_logs(engine, student_id=None, model_name=None, since=None, until=None, batch_size=500):
+    """Yield stage-output rows from `logs` using a server-side cursor."""
+    conditions = ["action IN ({})".format(", ".join(f":a{i}" for i in range(len(STAGE_ACTIONS))))]
+    params = {f"a{i}": action for i, action in enumerate(STAGE_ACTIONS)}
+    if student_id:
+        conditions.append("student_id = :student_id")
+        params["student_id"] = student_id
+    if model_name:
+        conditions.append("model_name = :model_name")
+        params["model_name"] = model_name
+    if since:
+        conditions.append("timestamp >= :since")
+        params["since"] = since
+    if until:
+        conditions.append("timestamp < :until")
+        params["until"] = until
+    query = text(
+        "SELECT id, user_id, student_id, model_name, action, details, timestamp FROM logs "
+        f"WHERE {' AND '.join(conditions)} ORDER BY user_id, timestamp, id"
+    )
+    with engine.connect() as conn:
+        result = conn.execution_options(stream_results=True, yield_per=batch_size).execute(query, params)
+        for row in result:
+            yield row
+
+
+def parse_details(details):
+    """`log_event` stores `str(dict)`; turn it back into a dict (or wrap raw text)."""
+    try:
+        value = ast.literal_eval(details or "")
+    except (ValueError, SyntaxError):
+        return {"result": details or ""}
+    return value if isinstance(value, dict) else {"result": str(value)}
+
+
+def parse_stories(output):
+    """Yield (role, goal, benefit, text) for every 'As a ..., I want ..., so that ...' in output."""
+    for match in STORY_PATTERN.finditer(output):
+        yield (
+            match.group("role").strip(" *_"),
+            LEADING_TO.sub("", match.group("goal").strip(" *_")),
+            match.group("benefit").strip(" *_"),
+            EMPHASIS.sub("", match.group(0)).strip(" |"),
+        )
+
+
+def iter_records(rows):
+    """Turn log rows into flat records: one per user story, or one per stage otherwise."""
+    for row in rows:
+        details = parse_details(row.details)
+        output = str(details.get("result", ""))
+        timestamp = row.timestamp
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.isoformat()
+        base = {
+            "log_id": row.id,
+            "user_id": row.user_id,
+            "student_id": row.student_id,
+            "model_name": row.model_name,
+            "timestamp": timestamp,
+            "action": row.action,
+            "stage": STAGE_ACTIONS.get(row.action, row.action),
+            "comparison": bool(details.get("comparison")),
+            # Latency and tokens are only recorded by comparison mode, and are None for saved results
+            "cached": details.get("cached"),
+            "latency_s": details.get("latency_s"),
+            "input_tokens": details.get("input_tokens"),
+            "output_tokens": details.get("output_tokens"),
+            "output_chars": details.get("output_chars"),
+            "story_index": None,
+            "role": None,
+            "goal": None,
+            "benefit": None,
+        }
+        stories = parse_stories(output) if row.action in STORY_ACTIONS else ()
+        found = False
+        for index, (role, goal, benefit, story) in enumerate(stories, start=1):
+            found = True
+            yield dict(base, story_index=index, role=role, goal=goal, benefit=benefit, text=story)
+        if not found:
+            yield dict(base, text=output)
+
+
+def jsonl_lines(records):
+    for record in records:
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def csv_lines(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=FIELDS)
+    writer.writeheader()
+    for record in records:
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.getvalue():
+        yield buffer.getvalue()
+
+
+def markdown_lines(records):
+    """Markdown report with one section per run (user_id) and one subsection per stage."""
+    yield "# Requirement Engineering Assistant – Export\n"
+    current_run = current_log = None
+    for record in records:
+        if record["user_id"] != current_run:
+            current_run = record["user_id"]
+            # A comparison run mixes models, so only the stage headings name the model
+            yield f"\n## Run `{current_run}` – student {record['student_id']}\n"
+        if record["log_id"] != current_log:
+            current_log = record["log_id"]
+            yield f"\n### {record['stage']} – {record['model_name']} ({record['timestamp']})\n\n"
+            if record["story_index"] is None:
+                yield record["text"] + "\n"
+                continue
+        yield f"{record['story_index']}. **{record['role']}** wants to {record['goal']}, so that {record['benefit']}\n"
+
+
+WRITERS = {"jsonl": jsonl_lines, "csv": csv_lines, "md": markdown_lines}
+
+
+def export(engine, fmt, out, **filters):
+    """Write the filtered export to the file-like `out`; return the number of records."""
+    count = 0
+
+    def counted(records):
+        nonlocal count
+        for record in records:
+            count += 1
+            yield record
+
+    for chunk in WRITERS[fmt](counted(iter_records(iter_logs(engine, **filters)))):
+        out.write(chunk)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export logged runs as Markdown, CSV or JSONL.")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="jsonl")
+    parser.add_argument("--out", help="output file (default: stdout)")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--student-id")
+    parser.add_argument("--model-name")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="e.g. 2025-09-01")
+    parser.add_argument("--until", type=datetime.fromisoformat, help="exclusive")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("pass --database-url or set DATABASE_URL")
+    engine = create_engine(args.database_url)
+    filters = dict(student_id=args.student_id, model_name=args.model_name, since=args.since, until=args.until)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8", newline="") as out:
+            count = export(engine, args.format, out, **filters)
+    else:
+        count = export(engine, args.format, sys.stdout, **filters)
+    print(f"Exported {count} records", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,17 @@ def get_llm(api_key,model_name):
         model_name=model_name #'llama3-70b-8192'
     )
 
+# Bump a stage's version whenever its prompt changes so saved outputs are regenerated.
+PROMPT_VERSIONS = {
+    "stakeholders": 1,
+    "elicitation": 1,
+    "justification": 1,
+    "user_stories": 1,
+    "invest": 1,
+    "prioritize": 1,
+    "conflicts": 1,
+}
+
 
 def findStakeholder(problem_statement,api_key,model_name):
     llm = get_llm(api_key,model_name)
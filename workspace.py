@@ -0,0 +1,145 @@
+import hashlib
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.orm import declarative_base, sessionmaker
+
+Base = declarative_base()
+
+# Order in which the app runs the stages, with the stage each one reads from.
+STAGE_INPUTS = {
+    "stakeholders": "problem_statement",
+    "elicitation": "stakeholders",
+    "justification": "elicitation",
+    "user_stories": "stakeholders",
+    "invest": "user_stories",
+    "prioritize": "invest",
+    "conflicts": "invest",
+}
+
+
+class Project(Base):
+    __tablename__ = "projects"
+    id = Column(String, primary_key=True)
+    student_id = Column(String)
+    problem_statement = Column(Text)
+    model_name = Column(String)   # last model the pipeline was run with
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class StageOutput(Base):
+    __tablename__ = "stage_outputs"
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    project_id = Column(String, index=True)
+    stage = Column(String)
+    input_hash = Column(String(64))
+    model_name = Column(String)
+    prompt_version = Column(String)
+    output = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_stage_outputs_lookup", "project_id", "stage", "model_name", "input_hash"),
+    )
+
+
+def init_workspace(engine):
+    """Create the workspace tables if needed and return a session factory."""
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def hash_input(text):
+    return hashlib.sha256((text or "").encode("utf-8")).hexdigest()
+
+
+def create_project(Session, student_id, problem_statement=""):
+    project_id = str(uuid.uuid4())
+    with Session() as session:
+        session.add(Project(id=project_id, student_id=student_id, problem_statement=problem_statement))
+        session.commit()
+    return project_id
+
+
+def get_project(Session, project_id):
+    with Session() as session:
+        return session.get(Project, project_id)
+
+
+def update_problem_statement(Session, project_id, problem_statement):
+    with Session() as session:
+        project = session.get(Project, project_id)
+        if project is not None and project.problem_statement != problem_statement:
+            project.problem_statement = problem_statement
+            session.commit()
+
+
+def set_project_model(Session, project_id, model_name):
+    with Session() as session:
+        project = session.get(Project, project_id)
+        if project is not None and project.model_name != model_name:
+            project.model_name = model_name
+            session.commit()
+
+
+def find_output(Session, project_id, stage, input_text, model_name, prompt_version):
+    """Return a stored output for exactly these inputs, or None."""
+    with Session() as session:
+        row = (
+            session.query(StageOutput.output)
+            .filter_by(
+                project_id=project_id,
+                stage=stage,
+                input_hash=hash_input(input_text),
+                model_name=model_name,
+                prompt_version=str(prompt_version),
+            )
+            .order_by(StageOutput.id.desc())
+            .first()
+        )
+    return row[0] if row else None
+
+
+def save_output(Session, project_id, stage, input_text, model_name, prompt_version, output):
+    with Session() as session:
+        session.add(StageOutput(
+            project_id=project_id,
+            stage=stage,
+            input_hash=hash_input(input_text),
+            model_name=model_name,
+            prompt_version=str(prompt_version),
+            output=output,
+        ))
+        session.commit()
+
+
+def run_stage(Session, project_id, stage, generate, input_text, model_name, prompt_version, force=False):
+    """Return (output, cached) for a stage, calling generate(input_text) only on a miss."""
+    if not force:
+        output = find_output(Session, project_id, stage, input_text, model_name, prompt_version)
+        if output is not None:
+            return output, True
+    output = generate(input_text)
+    save_output(Session, project_id, stage, input_text, model_name, prompt_version, output)
+    return output, False
+
+
+def resume_state(Session, project_id, model_name, prompt_versions):
+    """Rebuild the {stage: output} chain that is still valid for the stored problem statement.
+
+    Each stage is looked up by the hash of the output restored for the stage it
+    depends on (and the current prompt version), so whichever earlier run
+    matches the current inputs is restored and stale results are not shown.
+    """
+    project = get_project(Session, project_id)
+    if project is None:
+        return {}
+    state = {"problem_statement": project.problem_statement or ""}
+    for stage, source in STAGE_INPUTS.items():
+        if source not in state:
+            continue
+        output = find_output(Session, project_id, stage, state[source], model_name, prompt_versions[stage])
+        if output is not None:
+            state[stage] = output
+    return state